@@ -12,6 +12,8 @@ import pandas as pd
 import opensmile
 import joblib
 from werkzeug.utils import secure_filename
+from shared_audio import SharedAudioBuffer, DEFAULT_SHM_NAME
+import tracing
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend requests
@@ -82,21 +84,69 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def select_feature_columns(feats: pd.DataFrame) -> pd.DataFrame:
+    """Keep only the model's feature columns from openSMILE output."""
+    feats = feats.reset_index(drop=True)
+    
+    # Check for missing columns
+    missing = [c for c in FEATURE_COLUMNS if c not in feats.columns]
+    if missing:
+        raise ValueError(f"Missing columns in openSMILE output: {missing}")
+    
+    return feats[FEATURE_COLUMNS].copy()
+
+
 def extract_features_from_wav(wav_path: str) -> pd.DataFrame:
     """Extract eGeMAPS features from audio file."""
     try:
-        feats = smile.process_file(wav_path).reset_index(drop=True)
-        
-        # Check for missing columns
-        missing = [c for c in FEATURE_COLUMNS if c not in feats.columns]
-        if missing:
-            raise ValueError(f"Missing columns in openSMILE output: {missing}")
-        
-        return feats[FEATURE_COLUMNS].copy()
+        return select_feature_columns(smile.process_file(wav_path))
     except Exception as e:
         raise ValueError(f"Error extracting features: {str(e)}")
 
 
+def extract_features_from_signal(signal: np.ndarray, sampling_rate: int) -> pd.DataFrame:
+    """Extract eGeMAPS features from an in-memory signal (no file round trip)."""
+    try:
+        return select_feature_columns(smile.process_signal(signal, sampling_rate))
+    except Exception as e:
+        raise ValueError(f"Error extracting features: {str(e)}")
+
+
+def predict(X: pd.DataFrame) -> dict:
+    """Scale features and run the model. Returns the JSON response body."""
+    X_scaled = scaler.transform(X)
+    
+    # Predict
+    prediction = model.predict(X_scaled)[0]
+    
+    # Get probabilities if available
+    probabilities = None
+    if hasattr(model, 'predict_proba'):
+        proba = model.predict_proba(X_scaled)[0]
+        # Get class names if available
+        if hasattr(model, 'classes_'):
+            class_names = model.classes_
+            probabilities = {str(name): float(prob) for name, prob in zip(class_names, proba)}
+        else:
+            # Use indices if no class names
+            probabilities = {f'Class_{i}': float(prob) for i, prob in enumerate(proba)}
+    
+    return {
+        'prediction': str(prediction),
+        'probabilities': probabilities,
+        'features_extracted': len(FEATURE_COLUMNS),
+        'status': 'success'
+    }
+
+
+def request_session_id(body=None):
+    """Trace session ID sent by the client (header, JSON body or form field)."""
+    return (request.headers.get(tracing.SESSION_HEADER)
+            or (body or {}).get('session_id')
+            or request.form.get('session_id')
+            or None)
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze_audio():
     """Endpoint to receive audio file and return prediction."""
@@ -118,41 +168,25 @@ def analyze_audio():
             'probabilities': None
         }), 503
     
+    session_id = request_session_id()
+    
     # Save uploaded file temporarily
     temp_path = None
     try:
         # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
+        # Times the temp-file write only; the HTTP transfer has already finished here
+        with tracing.span('temp_write', session_id=session_id), \
+                tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
             temp_path = tmp_file.name
             file.save(temp_path)
         
         # Extract features
-        X = extract_features_from_wav(temp_path)
+        with tracing.span('extraction', session_id=session_id):
+            X = extract_features_from_wav(temp_path)
         
-        # Scale features
-        X_scaled = scaler.transform(X)
-        
-        # Predict
-        prediction = model.predict(X_scaled)[0]
-        
-        # Get probabilities if available
-        probabilities = None
-        if hasattr(model, 'predict_proba'):
-            proba = model.predict_proba(X_scaled)[0]
-            # Get class names if available
-            if hasattr(model, 'classes_'):
-                class_names = model.classes_
-                probabilities = {str(name): float(prob) for name, prob in zip(class_names, proba)}
-            else:
-                # Use indices if no class names
-                probabilities = {f'Class_{i}': float(prob) for i, prob in enumerate(proba)}
-        
-        return jsonify({
-            'prediction': str(prediction),
-            'probabilities': probabilities,
-            'features_extracted': len(FEATURE_COLUMNS),
-            'status': 'success'
-        })
+        with tracing.span('prediction', session_id=session_id):
+            result = predict(X)
+        return jsonify(result)
     
     except Exception as e:
         return jsonify({
@@ -170,6 +204,62 @@ def analyze_audio():
                 pass
 
 
+@app.route('/analyze_shm', methods=['POST'])
+def analyze_shared_audio():
+    """Score a time range of the realtime analyzer's shared-memory capture buffer.
+    
+    JSON body: {"shm_name": str (optional), "start": seconds or null, "end": seconds or null}
+    A missing start means the oldest sample still in the buffer.
+    """
+    body = request.get_json(silent=True) or {}
+    shm_name = body.get('shm_name') or DEFAULT_SHM_NAME
+    session_id = request_session_id(body)
+    
+    try:
+        start = body.get('start')
+        start = float(start) if start is not None else None
+        end = body.get('end')
+        end = float(end) if end is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'start and end must be numbers'}), 400
+    
+    if model is None or scaler is None:
+        return jsonify({
+            'error': 'Model or scaler not loaded',
+            'prediction': 'Model not available',
+            'probabilities': None
+        }), 503
+    
+    # Attach per request: the analyzer recreates the block for every session
+    try:
+        shared_buffer = SharedAudioBuffer.attach(shm_name)
+    except FileNotFoundError:
+        return jsonify({'error': f'Shared audio buffer not found: {shm_name}'}), 404
+    
+    try:
+        with tracing.span('extraction', session_id=session_id, source='shm'):
+            signal = shared_buffer.read_range(start, end)
+            X = extract_features_from_signal(signal, shared_buffer.sample_rate)
+            del signal  # Release the view before unmapping
+        
+        with tracing.span('prediction', session_id=session_id):
+            result = predict(X)
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'prediction': 'Error',
+            'probabilities': None
+        }), 500
+    
+    finally:
+        try:
+            shared_buffer.close()
+        except BufferError:
+            pass  # A view is still referenced; the mapping is freed with it
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -196,6 +286,7 @@ if __name__ == '__main__':
     port = int(os.getenv('PORT', 5001))
     print(f"\n🚀 Starting audio analysis server on http://localhost:{port}")
     print(f"📡 Endpoint: POST http://localhost:{port}/analyze")
+    print(f"📡 Endpoint: POST http://localhost:{port}/analyze_shm (shared memory)")
     print(f"❤️  Health check: GET http://localhost:{port}/health\n")
     
     app.run(host='0.0.0.0', port=port, debug=True)
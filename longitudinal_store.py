@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Append-only longitudinal store and incremental trend engine for check-in data.
+Ingests conversation_data.json and assessments_data.json into date-partitioned
+JSON Lines files with a per-user/per-day index, so trend queries only touch the
+days inside the requested window instead of re-parsing the whole history.
+
+Layout:
+    <root>/<user>/<kind>/index.json                     sorted list of days with data
+    <root>/<user>/<kind>/<YYYY-MM>/<YYYY-MM-DD>.jsonl    records, one per line
+    <root>/<user>/<kind>/<YYYY-MM>/<YYYY-MM-DD>.agg.json running totals for the day
+"""
+
+import json
+import os
+from datetime import date, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORE_DIR = os.path.join(BASE_DIR, 'longitudinal_store')
+DEFAULT_USER = 'default'
+
+CONVERSATIONS = 'conversations'
+ASSESSMENTS = 'assessments'
+
+SOURCE_FILES = {
+    CONVERSATIONS: os.path.join(BASE_DIR, 'conversation_data.json'),
+    ASSESSMENTS: os.path.join(BASE_DIR, 'assessments_data.json'),
+}
+
+# Numeric fields summed into the daily aggregates, per record kind
+METRICS = {
+    CONVERSATIONS: ['duration', 'speechActivity', 'avgSpeechRate', 'totalWords'],
+    ASSESSMENTS: ['orientationScore', 'attentionScore', 'immediateRecallScore', 'totalScore'],
+}
+
+WINDOWS = (7, 30)
+
+
+def _metric_values(kind, record):
+    """Extract the aggregated metrics from a record (TICS scores are nested)."""
+    source = record.get('scores', {}) if kind == ASSESSMENTS else record
+    values = {}
+    for metric in METRICS[kind]:
+        value = source.get(metric)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[metric] = value
+    return values
+
+
+def _write_json_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _empty_aggregate(kind):
+    return {
+        'count': 0,
+        'sums': {metric: 0 for metric in METRICS[kind]},
+        'counts': {metric: 0 for metric in METRICS[kind]},
+        'keys': [],
+        'bytes': 0,  # Size of the day's .jsonl these totals cover
+    }
+
+
+def _record_key(record):
+    return record.get('dateTime') or json.dumps(record, sort_keys=True)
+
+
+def _add_to_aggregate(aggregate, kind, record, key):
+    aggregate['count'] += 1
+    aggregate['keys'].append(key)
+    for metric, value in _metric_values(kind, record).items():
+        aggregate['sums'][metric] += value
+        aggregate['counts'][metric] += 1
+
+
+class LongitudinalStore:
+    """Date-partitioned, append-only store of per-user check-in records."""
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self._days = {}  # (user, kind) -> sorted list of days
+        self._aggregates = {}  # (user, kind, day) -> daily aggregate
+
+    # ------------------------------------------------------------------
+    # Paths and index
+    # ------------------------------------------------------------------
+
+    def _kind_dir(self, user, kind):
+        return os.path.join(self.root, user, kind)
+
+    def _day_path(self, user, kind, day, suffix):
+        return os.path.join(self._kind_dir(user, kind), day[:7], day + suffix)
+
+    def days(self, user, kind):
+        """Sorted list of days (YYYY-MM-DD) that have records."""
+        key = (user, kind)
+        if key not in self._days:
+            index_path = os.path.join(self._kind_dir(user, kind), 'index.json')
+            if os.path.exists(index_path):
+                with open(index_path) as f:
+                    self._days[key] = json.load(f)['days']
+            else:
+                self._days[key] = []
+        return self._days[key]
+
+    def _add_day(self, user, kind, day):
+        days = self.days(user, kind)
+        if (days and days[-1] == day) or day in days:
+            return
+        days.append(day)
+        days.sort()
+        _write_json_atomic(os.path.join(self._kind_dir(user, kind), 'index.json'),
+                           {'days': days})
+
+    def users(self):
+        """All users with data in the store."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, name)))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, kind, record, user=None):
+        """
+        Append one record and update its day's running totals.
+        Returns False if the record (same dateTime) was already stored.
+        """
+        user = user or record.get('userId') or DEFAULT_USER
+        day = record.get('date') or record.get('dateTime', '')[:10]
+        if not day:
+            raise ValueError('Record has no date')
+        key = _record_key(record)
+
+        aggregate = self.day_aggregate(user, kind, day) or _empty_aggregate(kind)
+        if key in aggregate['keys']:
+            return False
+
+        jsonl_path = self._day_path(user, kind, day, '.jsonl')
+        os.makedirs(os.path.dirname(jsonl_path), exist_ok=True)
+        with open(jsonl_path, 'ab') as f:
+            f.write((json.dumps(record) + '\n').encode('utf-8'))
+            aggregate['bytes'] = f.tell()
+
+        # If we crash before this write, the size mismatch triggers a rebuild on load
+        _add_to_aggregate(aggregate, kind, record, key)
+        _write_json_atomic(self._day_path(user, kind, day, '.agg.json'), aggregate)
+        self._aggregates[(user, kind, day)] = aggregate
+        self._add_day(user, kind, day)
+        return True
+
+    def ingest_file(self, kind, path=None):
+        """Append every not-yet-stored record from a legacy JSON array file."""
+        path = path or SOURCE_FILES[kind]
+        with open(path) as f:
+            records = json.load(f)
+        return sum(1 for record in records if self.append(kind, record))
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def day_aggregate(self, user, kind, day):
+        """Running totals for one day, or None if the day has no records."""
+        key = (user, kind, day)
+        if key not in self._aggregates:
+            agg_path = self._day_path(user, kind, day, '.agg.json')
+            jsonl_path = self._day_path(user, kind, day, '.jsonl')
+            aggregate = None
+            if os.path.exists(agg_path):
+                with open(agg_path) as f:
+                    aggregate = json.load(f)
+            size = os.path.getsize(jsonl_path) if os.path.exists(jsonl_path) else 0
+            if size == 0 and aggregate is None:
+                return None
+            if aggregate is None or aggregate.get('bytes') != size:
+                aggregate = self._rebuild_aggregate(user, kind, day)
+            self._aggregates[key] = aggregate
+        return self._aggregates[key]
+
+    def _rebuild_aggregate(self, user, kind, day):
+        """
+        Recompute a day's totals from its .jsonl after an interrupted append.
+        A torn last line is truncated so later appends start on a fresh line.
+        """
+        jsonl_path = self._day_path(user, kind, day, '.jsonl')
+        with open(jsonl_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                data = data[:data.rfind(b'\n') + 1]
+                f.seek(0)
+                f.truncate(len(data))
+
+        aggregate = _empty_aggregate(kind)
+        for line in data.decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record_key = _record_key(record)
+            if record_key not in aggregate['keys']:
+                _add_to_aggregate(aggregate, kind, record, record_key)
+        aggregate['bytes'] = len(data)
+        _write_json_atomic(self._day_path(user, kind, day, '.agg.json'), aggregate)
+        self._add_day(user, kind, day)
+        return aggregate
+
+    def records(self, user, kind, day):
+        """All records stored for one day."""
+        path = self._day_path(user, kind, day, '.jsonl')
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def window(self, user, kind, end_day, days):
+        """
+        Combine the daily aggregates of the `days` days ending on `end_day`.
+        Cost is O(days), independent of how much history is stored.
+        """
+        end = date.fromisoformat(end_day)
+        count = 0
+        active_days = 0
+        sums = {metric: 0 for metric in METRICS[kind]}
+        counts = {metric: 0 for metric in METRICS[kind]}
+        for offset in range(days):
+            aggregate = self.day_aggregate(user, kind, (end - timedelta(days=offset)).isoformat())
+            if aggregate is None:
+                continue
+            active_days += 1
+            count += aggregate['count']
+            for metric in METRICS[kind]:
+                sums[metric] += aggregate['sums'].get(metric, 0)
+                counts[metric] += aggregate['counts'].get(metric, 0)
+
+        means = {metric: (sums[metric] / counts[metric] if counts[metric] else None)
+                 for metric in METRICS[kind]}
+        return {
+            'days': days,
+            'sessions': count,
+            'activeDays': active_days,
+            'frequency': count / days,  # Sessions per day
+            'means': means,
+            'totals': sums,
+        }
+
+    # ------------------------------------------------------------------
+    # Trends
+    # ------------------------------------------------------------------
+
+    def trends(self, user=DEFAULT_USER, as_of=None):
+        """
+        Rolling 7/30-day summaries and week-over-week deltas for a user.
+        `as_of` defaults to the most recent day with conversation data.
+        """
+        if as_of is None:
+            days = self.days(user, CONVERSATIONS) or self.days(user, ASSESSMENTS)
+            as_of = days[-1] if days else date.today().isoformat()
+        previous_week_end = (date.fromisoformat(as_of) - timedelta(days=7)).isoformat()
+
+        result = {'user': user, 'asOf': as_of}
+        for kind in (CONVERSATIONS, ASSESSMENTS):
+            rolling = {f'{days}d': self.window(user, kind, as_of, days) for days in WINDOWS}
+            this_week = rolling['7d']
+            last_week = self.window(user, kind, previous_week_end, 7)
+
+            deltas = {'sessions': this_week['sessions'] - last_week['sessions']}
+            for metric in METRICS[kind]:
+                current, previous = this_week['means'][metric], last_week['means'][metric]
+                deltas[metric] = (current - previous
+                                  if current is not None and previous is not None else None)
+
+            result[kind] = {
+                'rolling': rolling,
+                'previousWeek': last_week,
+                'weekOverWeek': deltas,
+            }
+
+        # Total interaction time, so a week with no sessions at all still counts as a drop
+        conversations = result[CONVERSATIONS]
+        total_delta = (conversations['rolling']['7d']['totals']['duration']
+                       - conversations['previousWeek']['totals']['duration'])
+        conversations['weekOverWeek']['totalDuration'] = total_delta
+        result['flags'] = {
+            # "Interaction duration decreased this week" (behavioral signal, not diagnosis)
+            'durationDecreased': total_delta < 0,
+        }
+        return result
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Longitudinal check-in store and trend engine')
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR,
+                        help=f'Store directory (default: {DEFAULT_STORE_DIR})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('ingest', help='Append new records from the JSON data files')
+
+    trends_parser = subparsers.add_parser('trends', help='Print rolling trends as JSON')
+    trends_parser.add_argument('--user', default=DEFAULT_USER,
+                               help=f'User ID (default: {DEFAULT_USER})')
+    trends_parser.add_argument('--as-of', default=None,
+                               help='End date YYYY-MM-DD (default: latest day with data)')
+
+    args = parser.parse_args()
+    store = LongitudinalStore(args.store)
+
+    if args.command == 'ingest':
+        for kind, path in SOURCE_FILES.items():
+            if not os.path.exists(path):
+                print(f"Skipping {kind}: {path} not found")
+                continue
+            added = store.ingest_file(kind, path)
+            print(f"✅ {kind}: {added} new records ingested")
+    elif args.command == 'trends':
+        print(json.dumps(store.trends(args.user, args.as_of), indent=2))
+
+
+if __name__ == "__main__":
+    main()
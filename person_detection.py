@@ -5,6 +5,8 @@ import webbrowser
 import time
 import os
 import sys
+from pipeline_supervisor import PipelineSupervisor
+import tracing
 
 # Load the YOLOv8 model (the default pretrained)
 model = YOLO('yolo11n.pt')  # you can use 'yolov8s.pt' for more accuracy
@@ -19,53 +21,39 @@ REQUIRED_CONSECUTIVE_FRAMES = 5
 FRAMES_TO_SHUTDOWN = 15  # Frames without person before shutting down
 triggered = False  # Flag to prevent multiple triggers
 
-# Store subprocess references
-dev_server_process = None
-audio_analysis_process = None
+# Warm standby supervisor for the web server and audio analysis
+supervisor = PipelineSupervisor()
 
-def trigger_pipeline():
-    """Trigger the pipeline: start dev server, open browser, run audio analysis"""
-    global dev_server_process, audio_analysis_process, triggered
+def trigger_pipeline(detected_at=None, detected_wall_time=None):
+    """Wake the pipeline: open browser on the warm server, start audio analysis"""
+    global triggered
     
     if triggered:
         return  # Already triggered, don't run again
     
     triggered = True
     print("\n" + "="*60)
-    print("🚀 PERSON DETECTED! Starting pipeline...")
+    print("🚀 PERSON DETECTED! Waking pipeline...")
     print("="*60)
     
-    try:
-        # 1. Start pnpm run dev (in background)
-        print("📦 Starting dev server (pnpm run dev)...")
-        dev_server_process = subprocess.Popen(
-            ['pnpm', 'start'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=os.path.dirname(os.path.abspath(__file__))
-        )
-        print("   ✓ Dev server started (PID: {})".format(dev_server_process.pid))
-        
-        # 2. Wait a bit for server to start, then open browser
-        print("⏳ Waiting for server to start...")
-        time.sleep(3)  # Give server time to start
-        
-        print("🌐 Opening browser to http://localhost:3000...")
-        webbrowser.open('http://localhost:3000')
+    # New trace session, shared with the audio analysis and analysis server
+    session_id = tracing.new_session_id()
+    tracing.emit('detection_frame', ts=detected_wall_time,
+                 consecutive_frames=consecutive_person_frames)
+    
+    def open_browser(url):
+        print(f"🌐 Opening browser to {url}...")
+        webbrowser.open(url)
         print("   ✓ Browser opened")
-        
-        # 3. Run audio analysis script (in background)
-        print("🎤 Starting real-time audio analysis...")
-        script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'realtime_audio_analysis.py')
-        audio_analysis_process = subprocess.Popen(
-            [sys.executable, script_path],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        print("   ✓ Audio analysis started (PID: {})".format(audio_analysis_process.pid))
+    
+    try:
+        elapsed = supervisor.wake(open_browser, detected_at=detected_at, session_id=session_id)
+        if elapsed is None:
+            triggered = False  # Allow retry on error
+            return
         
         print("\n✅ Pipeline activated!")
-        print("   - Dev server running on http://localhost:3000")
+        print(f"   - Dev server running on {supervisor.web_url}")
         print("   - Browser opened")
         print("   - Audio analysis running")
         print("\nPress 'q' to exit and stop all processes\n")
@@ -76,38 +64,15 @@ def trigger_pipeline():
 
 def shutdown_pipeline_and_exit():
     """Shutdown all processes and exit program when person leaves"""
-    global dev_server_process, audio_analysis_process, triggered, consecutive_no_person_frames
+    global triggered, consecutive_no_person_frames
     
     print("\n" + "="*60)
     print("👋 PERSON LEFT! Exiting program...")
     print("="*60)
     
     try:
-        # Stop dev server
-        if dev_server_process:
-            print("   Stopping dev server...")
-            dev_server_process.terminate()
-            try:
-                dev_server_process.wait(timeout=3)
-                print("   ✓ Dev server stopped")
-            except subprocess.TimeoutExpired:
-                print("   ⚠ Dev server didn't stop, killing...")
-                dev_server_process.kill()
-                dev_server_process.wait()
-            dev_server_process = None
-        
-        # Stop audio analysis
-        if audio_analysis_process:
-            print("   Stopping audio analysis...")
-            audio_analysis_process.terminate()
-            try:
-                audio_analysis_process.wait(timeout=3)
-                print("   ✓ Audio analysis stopped")
-            except subprocess.TimeoutExpired:
-                print("   ⚠ Audio analysis didn't stop, killing...")
-                audio_analysis_process.kill()
-                audio_analysis_process.wait()
-            audio_analysis_process = None
+        # Stop dev server and audio analysis
+        supervisor.stop()
         
         # Try to close browser (macOS)
         try:
@@ -134,10 +99,15 @@ def shutdown_pipeline_and_exit():
     # Exit program
     sys.exit(0)
 
+# Pre-start the web server and audio analysis so detection can wake them instantly
+supervisor.start()
+
 while True:
     ret, frame = cap.read()
     if not ret:
         break
+    frame_time = time.monotonic()  # Capture time, used to measure time-to-greeting
+    frame_wall_time = time.time()  # Same instant on the wall clock, for tracing
 
     # Perform detection
     # The model expects BGR images (as provided by OpenCV)
@@ -170,7 +140,7 @@ while True:
         
         # Trigger pipeline if we hit the threshold
         if consecutive_person_frames >= REQUIRED_CONSECUTIVE_FRAMES and not triggered:
-            trigger_pipeline()
+            trigger_pipeline(detected_at=frame_time, detected_wall_time=frame_wall_time)
     else:
         consecutive_person_frames = 0
         
@@ -201,22 +171,7 @@ while True:
 
 # Cleanup on manual exit (Ctrl+C or 'q')
 print("\n🛑 Exiting - stopping all processes...")
-if dev_server_process:
-    print("   Stopping dev server...")
-    dev_server_process.terminate()
-    try:
-        dev_server_process.wait(timeout=3)
-    except subprocess.TimeoutExpired:
-        dev_server_process.kill()
-        dev_server_process.wait()
-if audio_analysis_process:
-    print("   Stopping audio analysis...")
-    audio_analysis_process.terminate()
-    try:
-        audio_analysis_process.wait(timeout=3)
-    except subprocess.TimeoutExpired:
-        audio_analysis_process.kill()
-        audio_analysis_process.wait()
+supervisor.stop()
 
 cap.release()
 cv2.destroyAllWindows()
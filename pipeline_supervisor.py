@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Warm standby supervisor for the check-in pipeline.
+Pre-starts the web server and the audio analyzer so a detected person can be
+greeted immediately, probes them for readiness, and restarts them with backoff
+if they crash.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import tracing
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Readiness / restart configuration
+READY_TIMEOUT = 60  # Seconds to wait for a process to report ready
+PROBE_INTERVAL = 0.2  # Seconds between HTTP readiness probes
+BACKOFF_INITIAL = 0.5  # First restart delay after a crash
+BACKOFF_MAX = 30  # Upper bound on the restart delay
+STABLE_UPTIME = 60  # Seconds of uptime after which the backoff resets
+
+# Handshake lines exchanged with the audio analyzer over stdin/stdout
+READY_LINE = 'READY'
+START_LINE = 'START'
+STARTED_LINE = 'STARTED'
+PREDICTION_PREFIX = 'PREDICTION '
+
+
+def http_probe(url, timeout=1.0):
+    """Return True if the URL answers with a non-error HTTP status."""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status < 500
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return False
+
+
+class ManagedProcess:
+    """A supervised child process with a readiness check and crash restarts."""
+
+    def __init__(self, name, args, cwd=BASE_DIR, probe_url=None, handshake=False):
+        self.name = name
+        self.args = args
+        self.cwd = cwd
+        self.probe_url = probe_url
+        self.handshake = handshake
+
+        self.process = None
+        self.ready = threading.Event()
+        self.started = threading.Event()
+        self.stopping = False
+        self.backoff = BACKOFF_INITIAL
+        self.restart_at = None  # time.monotonic() deadline of a pending restart
+        self.spawned_at = None
+        self.restarts = 0
+        self.last_prediction = None  # Latest result reported by the analyzer
+
+        self._lock = threading.Lock()
+
+    def spawn(self):
+        """Start the process and its output reader / readiness threads."""
+        with self._lock:
+            self.ready.clear()
+            self.started.clear()
+            self.process = subprocess.Popen(
+                self.args,
+                stdin=subprocess.PIPE if self.handshake else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=self.cwd,
+                text=True,
+                bufsize=1,
+            )
+            self.spawned_at = time.monotonic()
+            process = self.process
+        print(f"   ✓ {self.name} pre-started (PID: {process.pid})")
+        # Spawns happen in standby, outside any session; only the wake path is tagged
+        tracing.emit('pipeline_spawn', session_id=tracing.NO_SESSION,
+                     process=self.name, pid=process.pid, restarts=self.restarts)
+
+        # Always drain stdout so the child never blocks on a full pipe
+        threading.Thread(target=self._read_output, args=(process,), daemon=True).start()
+        if self.probe_url:
+            threading.Thread(target=self._probe_http, args=(process,), daemon=True).start()
+
+    def _read_output(self, process):
+        """Drain child output and watch for handshake lines."""
+        for line in process.stdout:
+            line = line.strip()
+            if line == READY_LINE:
+                self.ready.set()
+            elif line == STARTED_LINE:
+                self.started.set()
+            elif line.startswith(PREDICTION_PREFIX):
+                try:
+                    self.last_prediction = json.loads(line[len(PREDICTION_PREFIX):])
+                except ValueError:
+                    continue
+                print(f"🧠 {self.name} prediction: {self.last_prediction.get('prediction')}")
+
+    def _probe_http(self, process):
+        """Poll the probe URL until it answers or the process dies."""
+        deadline = time.monotonic() + READY_TIMEOUT
+        while process.poll() is None and time.monotonic() < deadline:
+            if http_probe(self.probe_url):
+                self.ready.set()
+                return
+            time.sleep(PROBE_INTERVAL)
+
+    def wait_ready(self, timeout=READY_TIMEOUT):
+        """Block until the process reports ready. Returns True on success."""
+        return self.ready.wait(timeout)
+
+    def send(self, line):
+        """Send a control line to the process over stdin."""
+        with self._lock:
+            if self.process is None or self.process.poll() is not None:
+                return False
+            try:
+                self.process.stdin.write(line + '\n')
+                self.process.stdin.flush()
+                return True
+            except (BrokenPipeError, OSError):
+                return False
+
+    def check(self):
+        """Restart the process with backoff if it has exited unexpectedly."""
+        with self._lock:
+            process = self.process
+        if self.stopping or process is None:
+            return
+        now = time.monotonic()
+
+        if self.restart_at is None:
+            returncode = process.poll()
+            if returncode is None:
+                if now - self.spawned_at >= STABLE_UPTIME:
+                    self.backoff = BACKOFF_INITIAL
+                return
+
+            # Not ready until respawned, so wake() waits instead of using a dead process
+            self.ready.clear()
+            self.started.clear()
+
+            if returncode == 0:
+                # Clean exit (e.g. analyzer finished its session): back to standby now
+                print(f"   ↻ {self.name} exited, returning to standby...")
+                self.restart_at = now
+            else:
+                print(f"   ⚠ {self.name} crashed (exit code {returncode}), "
+                      f"restarting in {self.backoff:.1f}s...")
+                # Deadline instead of sleeping, so other processes keep being monitored
+                self.restart_at = now + self.backoff
+                self.backoff = min(self.backoff * 2, BACKOFF_MAX)
+
+        if now >= self.restart_at and not self.stopping:
+            self.restart_at = None
+            self.restarts += 1
+            self.spawn()
+
+    def stop(self):
+        """Terminate the process, killing it if it does not exit in time."""
+        self.stopping = True
+        with self._lock:
+            process = self.process
+            self.process = None
+        if process is None or process.poll() is not None:
+            return
+        print(f"   Stopping {self.name}...")
+        process.terminate()
+        try:
+            process.wait(timeout=3)
+            print(f"   ✓ {self.name} stopped")
+        except subprocess.TimeoutExpired:
+            print(f"   ⚠ {self.name} didn't stop, killing...")
+            process.kill()
+            process.wait()
+
+
+class PipelineSupervisor:
+    """Keeps the web server and audio analyzer warm and wakes them on detection."""
+
+    def __init__(self, web_url='http://localhost:3000', monitor_interval=1.0):
+        self.web_url = web_url
+        self.monitor_interval = monitor_interval
+
+        self.web_server = ManagedProcess(
+            'Web server',
+            ['pnpm', 'start'],
+            probe_url=web_url,
+        )
+        self.audio_analyzer = ManagedProcess(
+            'Audio analysis',
+            [sys.executable, os.path.join(BASE_DIR, 'realtime_audio_analysis.py'), '--standby'],
+            handshake=True,
+        )
+        self.processes = [self.web_server, self.audio_analyzer]
+
+        self._running = False
+        self._monitor_thread = None
+
+    def start(self):
+        """Pre-start all processes in standby and begin crash monitoring."""
+        print("🔥 Warming up pipeline (standby)...")
+        for proc in self.processes:
+            proc.stopping = False
+            proc.restart_at = None
+            proc.spawn()
+        self._running = True
+        self._monitor_thread = threading.Thread(target=self._monitor, daemon=True)
+        self._monitor_thread.start()
+
+    def _monitor(self):
+        while self._running:
+            for proc in self.processes:
+                proc.check()
+            time.sleep(self.monitor_interval)
+
+    def wait_ready(self, timeout=READY_TIMEOUT):
+        """Wait until every process has passed its readiness check."""
+        deadline = time.monotonic() + timeout
+        for proc in self.processes:
+            remaining = max(0, deadline - time.monotonic())
+            if not proc.wait_ready(remaining):
+                print(f"   ⚠ {proc.name} not ready after {timeout}s")
+                return False
+        return True
+
+    def wake(self, open_browser, detected_at=None, session_id=None, timeout=10):
+        """
+        Wake the standby pipeline for a detected person.
+
+        `open_browser` is called once the web server is ready. `detected_at` is
+        the time.monotonic() timestamp of the detection frame and is used to
+        report time-to-greeting. `session_id` is handed to the audio analyzer so
+        its trace events join the session. Returns the elapsed seconds, or None
+        on failure.
+        """
+        if detected_at is None:
+            detected_at = time.monotonic()
+        session_id = session_id or tracing.current_session_id()
+        wake_ts = time.time()
+
+        if not self.web_server.wait_ready(timeout):
+            print("❌ Web server not ready")
+            return None
+        with tracing.span('browser_open', session_id=session_id):
+            open_browser(self.web_url)
+
+        if not self.audio_analyzer.wait_ready(timeout):
+            print("❌ Audio analysis not ready")
+            return None
+        self.audio_analyzer.started.clear()
+        start_line = f'{START_LINE} {session_id}' if session_id else START_LINE
+        if not self.audio_analyzer.send(start_line):
+            print("❌ Could not wake audio analysis")
+            return None
+        if not self.audio_analyzer.started.wait(timeout):
+            print("⚠ Audio analysis did not confirm stream start")
+
+        elapsed = time.monotonic() - detected_at
+        tracing.emit('pipeline_wake', session_id=session_id, ts=wake_ts,
+                     duration=time.time() - wake_ts, time_to_greeting_ms=round(elapsed * 1000))
+        print(f"⏱  Time to greeting: {elapsed * 1000:.0f} ms (from detection frame)")
+        return elapsed
+
+    def stop(self):
+        """Stop monitoring and terminate all processes."""
+        self._running = False
+        for proc in self.processes:
+            proc.stop()
@@ -11,6 +11,12 @@ import matplotlib.animation as animation
 from collections import deque
 import time
 import threading
+import sys
+import json
+import urllib.request
+import urllib.error
+from shared_audio import SharedAudioBuffer, DEFAULT_SHM_NAME
+import tracing
 
 # Configuration
 DURATION = 10  # Total seconds to record (set to None for continuous)
@@ -19,10 +25,12 @@ fs = 44100  # Sampling frequency
 CHUNK_SIZE = int(CHUNK_DURATION * fs)
 THRESHOLD = 0.01  # Amplitude threshold for speech detection
 MIN_BREAK_SECONDS = 0.7  # Minimum silence duration to separate phrases
+ANALYSIS_URL = 'http://localhost:5001'  # audio_server.py
 
 class RealTimeAudioAnalyzer:
-    def __init__(self, duration=None, sample_rate=44100):
+    def __init__(self, duration=None, sample_rate=44100, shm_name=None, analysis_url=None):
         self.duration = duration
+        self.analysis_url = analysis_url
         self.fs = sample_rate
         self.chunk_size = int(CHUNK_DURATION * self.fs)
         self.threshold = THRESHOLD
@@ -32,6 +40,12 @@ class RealTimeAudioAnalyzer:
         self.audio_buffer = deque(maxlen=int((duration or 10) * self.fs))
         self.time_buffer = deque(maxlen=int((duration or 10) * self.fs))
         
+        # Shared-memory copy of the capture for the analysis server (optional)
+        self.shared_buffer = None
+        self.shm_name = shm_name
+        if shm_name:
+            self.shared_buffer = SharedAudioBuffer.create(shm_name, sample_rate=self.fs)
+        
         # Analysis data
         self.speech_segments = []
         self.phrase_segments = []
@@ -79,6 +93,10 @@ class RealTimeAudioAnalyzer:
         
         elapsed = current_time - self.start_time
         
+        # Publish to shared memory for the analysis server
+        if self.shared_buffer is not None:
+            self.shared_buffer.write(audio_chunk)
+        
         # Add to buffers
         for sample in audio_chunk:
             self.audio_buffer.append(sample)
@@ -155,6 +173,10 @@ class RealTimeAudioAnalyzer:
         else:
             speech_rate = 0
         
+        if speech_segments and not self.speech_segments:
+            tracing.emit('first_speech_segment',
+                         ts=self.start_time + time_axis[speech_segments[0][0]])
+        
         # Update stored values
         self.speech_segments = speech_segments
         self.phrase_segments = phrase_segments
@@ -213,7 +235,7 @@ class RealTimeAudioAnalyzer:
         
         return self.line,
     
-    def run(self):
+    def run(self, announce_start=False):
         """Start real-time analysis"""
         print(f"Starting real-time audio analysis...")
         if self.duration:
@@ -235,6 +257,11 @@ class RealTimeAudioAnalyzer:
             )
             
             with stream:
+                tracing.emit('stream_open', sample_rate=self.fs)
+                if announce_start:
+                    # Tell the pipeline supervisor the stream is live
+                    print("STARTED", flush=True)
+                
                 # Start animation
                 ani = animation.FuncAnimation(
                     self.fig, 
@@ -271,6 +298,52 @@ class RealTimeAudioAnalyzer:
             print(f"  Silence Time: {self.silence_time:.2f} seconds")
             print(f"  Estimated Words: {self.total_words}")
             print(f"  Speech Rate: {self.speech_rate:.2f} words/sec")
+            
+            if self.shared_buffer is not None:
+                try:
+                    if self.analysis_url:
+                        self.request_prediction()
+                finally:
+                    self.shared_buffer.close()
+                    self.shared_buffer = None
+    
+    def request_prediction(self):
+        """Ask the analysis server to score the session straight from shared memory"""
+        session_id = tracing.current_session_id()
+        # No start: the buffer clamps to the oldest retained sample, so sessions
+        # longer than the ring are scored on their most recent audio
+        payload = json.dumps({
+            'session_id': session_id,
+            'shm_name': self.shm_name,
+            'end': self.shared_buffer.duration,
+        }).encode('utf-8')
+        req = urllib.request.Request(
+            self.analysis_url.rstrip('/') + '/analyze_shm',
+            data=payload,
+            headers={'Content-Type': 'application/json',
+                     tracing.SESSION_HEADER: session_id or ''},
+            method='POST'
+        )
+        try:
+            with tracing.span('prediction_request'), \
+                    urllib.request.urlopen(req, timeout=30) as response:
+                result = json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                result = json.loads(e.read().decode('utf-8') or '{}')
+            except ValueError:
+                result = {'error': f'HTTP {e.code} from analysis server'}
+        except (urllib.error.URLError, OSError) as e:
+            print(f"  Analysis server unavailable: {e}")
+            return None
+        except ValueError as e:
+            print(f"  Invalid response from analysis server: {e}")
+            return None
+        
+        print(f"  Prediction: {result.get('prediction')}")
+        # Machine-readable copy for the pipeline supervisor, which reads our stdout
+        print(f"PREDICTION {json.dumps(result)}", flush=True)
+        return result
 
 
 def main():
@@ -284,6 +357,12 @@ def main():
                        help='Audio sample rate (default: 44100)')
     parser.add_argument('--threshold', type=float, default=0.01,
                        help='Amplitude threshold for speech detection (default: 0.01)')
+    parser.add_argument('--shm-name', default=DEFAULT_SHM_NAME,
+                       help=f'Shared memory block to publish audio to (default: {DEFAULT_SHM_NAME}, "" to disable)')
+    parser.add_argument('--analysis-url', default=ANALYSIS_URL,
+                       help=f'Analysis server to score the session on exit (default: {ANALYSIS_URL}, "" to disable)')
+    parser.add_argument('--standby', action='store_true',
+                       help='Load everything, print READY and wait for START on stdin before recording')
     
     args = parser.parse_args()
     
@@ -291,11 +370,29 @@ def main():
     
     analyzer = RealTimeAudioAnalyzer(
         duration=duration,
-        sample_rate=args.sample_rate
+        sample_rate=args.sample_rate,
+        shm_name=args.shm_name,
+        analysis_url=args.analysis_url
     )
     analyzer.threshold = args.threshold
     
-    analyzer.run()
+    if args.standby:
+        # Warm standby: heavy imports and plot setup are done, wait to be woken
+        print("READY", flush=True)
+        for line in sys.stdin:
+            command, _, session_id = line.strip().partition(' ')
+            if command == "START":
+                # The supervisor passes the trace session ID along with START
+                if session_id:
+                    tracing.set_session_id(session_id)
+                break
+        else:
+            return  # Supervisor closed stdin without waking us
+    
+    if tracing.current_session_id() is None:
+        tracing.new_session_id()  # Run on its own: trace as a standalone session
+    
+    analyzer.run(announce_start=args.standby)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Shared-memory audio ring buffer.
+The realtime analyzer publishes its capture buffer here so the analysis server
+can score a time range of it directly, without saving and re-uploading a file.
+"""
+
+import numpy as np
+from multiprocessing import shared_memory
+
+DEFAULT_SHM_NAME = 'tigerlaunch_audio'
+DEFAULT_CAPACITY_SECONDS = 120  # Ring buffer length
+
+# Header layout (int64 slots) at the start of the shared memory block
+HEADER_SLOTS = 3
+CAPACITY, SAMPLE_RATE, TOTAL_WRITTEN = range(HEADER_SLOTS)
+HEADER_BYTES = HEADER_SLOTS * np.dtype(np.int64).itemsize
+
+
+def _attach_untracked(name):
+    """Attach to an existing block without letting this process unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+
+class SharedAudioBuffer:
+    """Mono float32 ring buffer in shared memory with a small int64 header."""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self.header[CAPACITY])
+        self.data = np.ndarray((self.capacity,), dtype=np.float32,
+                               buffer=shm.buf, offset=HEADER_BYTES)
+
+    @classmethod
+    def create(cls, name=DEFAULT_SHM_NAME, sample_rate=44100,
+               capacity_seconds=DEFAULT_CAPACITY_SECONDS):
+        """Create (or replace) the shared buffer. Called by the analyzer."""
+        capacity = int(capacity_seconds * sample_rate)
+        size = HEADER_BYTES + capacity * np.dtype(np.float32).itemsize
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()  # Left behind by a crashed analyzer
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[CAPACITY] = capacity
+        header[SAMPLE_RATE] = sample_rate
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name=DEFAULT_SHM_NAME):
+        """Attach to a buffer published by another process. Called by the server."""
+        return cls(_attach_untracked(name), owner=False)
+
+    @property
+    def sample_rate(self):
+        return int(self.header[SAMPLE_RATE])
+
+    @property
+    def total_written(self):
+        return int(self.header[TOTAL_WRITTEN])
+
+    @property
+    def duration(self):
+        """Seconds of audio written since the stream started."""
+        return self.total_written / self.sample_rate
+
+    def write(self, chunk):
+        """Append samples to the ring. The cursor is published after the data."""
+        chunk = np.asarray(chunk, dtype=np.float32)
+        n = len(chunk)
+        if n == 0:
+            return
+        if n > self.capacity:
+            chunk = chunk[-self.capacity:]
+            skipped = n - self.capacity
+            n = self.capacity
+        else:
+            skipped = 0
+        total = self.total_written + skipped
+        pos = total % self.capacity
+        first = min(n, self.capacity - pos)
+        self.data[pos:pos + first] = chunk[:first]
+        if first < n:
+            self.data[:n - first] = chunk[first:]
+        self.header[TOTAL_WRITTEN] = total + n
+
+    def read_range(self, start=None, end=None):
+        """
+        Return samples between `start` and `end` seconds of the stream.
+
+        `start=None` means the oldest sample still retained in the ring, and
+        `end=None` means the newest. The result is a view into shared memory
+        unless the range wraps around the end of the ring, in which case the
+        two halves are concatenated. Raises ValueError if an explicit `start`
+        has already been overwritten.
+        """
+        fs = self.sample_rate
+        total = self.total_written
+        oldest_idx = max(0, total - self.capacity)
+        if start is None:
+            start_idx = oldest_idx
+        else:
+            start_idx = max(0, int(round(start * fs)))
+            if start_idx < oldest_idx:
+                raise ValueError('Requested audio range is no longer in the buffer')
+        end_idx = total if end is None else min(total, int(round(end * fs)))
+        if end_idx <= start_idx:
+            raise ValueError('Empty audio range')
+
+        a = start_idx % self.capacity
+        b = a + (end_idx - start_idx)
+        if b <= self.capacity:
+            return self.data[a:b]
+        return np.concatenate((self.data[a:], self.data[:b - self.capacity]))
+
+    def close(self):
+        """Release the mapping, and remove the block if this process created it."""
+        del self.header, self.data
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
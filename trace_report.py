@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Latency report for trace events written by tracing.py.
+Prints a waterfall per session and percentile breakdowns per stage, so it's
+easy to see which stage dominates the detection-to-result time.
+"""
+
+import json
+import os
+from collections import defaultdict
+
+from tracing import TRACE_FILE
+
+PERCENTILES = (50, 90, 99)
+
+# End-to-end latency runs from the detection frame to the end of prediction
+E2E_START = 'detection_frame'
+E2E_END = 'prediction'
+
+
+def load_events(path=TRACE_FILE):
+    """Read the collector file, skipping malformed lines."""
+    events = []
+    if not os.path.exists(path):
+        return events
+    with open(path) as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events
+
+
+def group_sessions(events):
+    """Group events by session ID (events without one are dropped), in time order."""
+    sessions = defaultdict(list)
+    for event in events:
+        if event.get('session'):
+            sessions[event['session']].append(event)
+    for session_events in sessions.values():
+        session_events.sort(key=lambda e: e['ts'])
+    return dict(sorted(sessions.items(), key=lambda item: item[1][0]['ts']))
+
+
+def session_bounds(session_events):
+    """Return (start, end) wall-clock times covered by a session's events."""
+    start = min(e['ts'] for e in session_events)
+    end = max(e['ts'] + (e.get('dur') or 0) for e in session_events)
+    return start, end
+
+
+def detection_time(session_events):
+    """Timestamp of the session's detection frame, or None if it wasn't traced."""
+    starts = [e['ts'] for e in session_events if e['stage'] == E2E_START]
+    return min(starts) if starts else None
+
+
+def end_to_end(session_events):
+    """
+    Return (start, end) from the detection frame to the end of prediction,
+    or None if the session is missing either stage.
+    """
+    start = detection_time(session_events)
+    ends = [e['ts'] + (e.get('dur') or 0) for e in session_events if e['stage'] == E2E_END]
+    if start is None or not ends:
+        return None
+    return start, max(ends)
+
+
+def session_origin(session_events):
+    """Waterfall zero point: the detection frame if traced, else the first event."""
+    origin = detection_time(session_events)
+    return origin if origin is not None else session_bounds(session_events)[0]
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers."""
+    values = sorted(values)
+    if not values:
+        return None
+    k = (len(values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def print_waterfall(session_id, session_events, width=50):
+    """Print one session's events as offset / duration bars."""
+    e2e = end_to_end(session_events)
+    start = session_origin(session_events)
+    end = session_bounds(session_events)[1]
+    total = max(end - start, 1e-9)
+    e2e_text = f"{(e2e[1] - e2e[0]) * 1000:.0f} ms" if e2e else 'incomplete'
+    origin_text = '' if detection_time(session_events) is not None else f', no {E2E_START}: offsets from first event'
+    print(f"\nSession {session_id}  (end-to-end {e2e_text}{origin_text})")
+    for event in session_events:
+        offset = event['ts'] - start
+        dur = event.get('dur') or 0
+        col = max(0, int(offset / total * width))
+        length = max(1, int(dur / total * width)) if dur else 1
+        bar = ' ' * min(col, width - 1) + ('█' * length if dur else '•')
+        dur_text = f"{dur * 1000:8.1f} ms" if dur else '         -'
+        print(f"  {event['stage']:<22} {offset * 1000:8.1f} ms {dur_text}  |{bar[:width + 1]:<{width + 1}}|")
+
+
+def stage_stats(sessions):
+    """
+    Per-stage percentile stats of duration (all sessions) and of offset from
+    the detection frame (only sessions that traced one, so offsets share a zero).
+    """
+    offsets = defaultdict(list)
+    durations = defaultdict(list)
+    totals = []
+    detected = 0
+    for session_events in sessions.values():
+        e2e = end_to_end(session_events)
+        if e2e:
+            totals.append(e2e[1] - e2e[0])
+        origin = detection_time(session_events)
+        if origin is not None:
+            detected += 1
+        seen = set()
+        for event in session_events:
+            stage = event['stage']
+            if stage in seen:
+                continue  # First occurrence per session
+            seen.add(stage)
+            if origin is not None:
+                offsets[stage].append(event['ts'] - origin)
+            if event.get('dur') is not None:
+                durations[stage].append(event['dur'])
+
+    stats = {}
+    for stage in set(offsets) | set(durations):
+        stats[stage] = {
+            'offset': ({p: percentile(offsets[stage], p) for p in PERCENTILES}
+                       if offsets[stage] else None),
+            'offsetCount': len(offsets[stage]),
+            'duration': ({p: percentile(durations[stage], p) for p in PERCENTILES}
+                         if durations[stage] else None),
+            'durationCount': len(durations[stage]),
+        }
+    return stats, totals, detected
+
+
+def print_percentiles(sessions):
+    """Print end-to-end and per-stage percentiles, slowest stages first."""
+    stats, totals, detected = stage_stats(sessions)
+    header = '  '.join(f"p{p:<7}" for p in PERCENTILES)
+
+    print(f"\nEnd-to-end ({E2E_START} -> {E2E_END}) over {len(totals)} complete sessions (ms):")
+    if totals:
+        print('  ' + '  '.join(f"p{p}={percentile(totals, p) * 1000:.0f}" for p in PERCENTILES))
+    else:
+        print('  no session has both stages traced')
+
+    print("\nStage durations (ms), slowest p50 first:")
+    print(f"  {'stage':<22} {'n':>4}  {header}")
+    timed = [(stage, s) for stage, s in stats.items() if s['duration']]
+    timed.sort(key=lambda item: item[1]['duration'][50], reverse=True)
+    for stage, s in timed:
+        cells = '  '.join(f"{s['duration'][p] * 1000:<8.1f}" for p in PERCENTILES)
+        print(f"  {stage:<22} {s['durationCount']:>4}  {cells}")
+
+    print(f"\nStage start offsets from {E2E_START} over {detected} sessions with one (ms):")
+    print(f"  {'stage':<22} {'n':>4}  {header}")
+    placed = [(stage, s) for stage, s in stats.items() if s['offset']]
+    placed.sort(key=lambda item: item[1]['offset'][50])
+    for stage, s in placed:
+        cells = '  '.join(f"{s['offset'][p] * 1000:<8.1f}" for p in PERCENTILES)
+        print(f"  {stage:<22} {s['offsetCount']:>4}  {cells}")
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Per-session latency waterfalls and percentiles')
+    parser.add_argument('--file', default=TRACE_FILE,
+                        help=f'Trace collector file (default: {TRACE_FILE})')
+    parser.add_argument('--session', default=None,
+                        help='Only show this session ID')
+    parser.add_argument('--last', type=int, default=5,
+                        help='Number of most recent session waterfalls to print (default: 5)')
+    parser.add_argument('--width', type=int, default=50,
+                        help='Waterfall bar width in characters (default: 50)')
+
+    args = parser.parse_args()
+
+    sessions = group_sessions(load_events(args.file))
+    if args.session:
+        sessions = {k: v for k, v in sessions.items() if k == args.session}
+    if not sessions:
+        print(f"No traced sessions found in {args.file}")
+        return
+
+    if args.last > 0:
+        for session_id, session_events in list(sessions.items())[-args.last:]:
+            print_waterfall(session_id, session_events, args.width)
+
+    print_percentiles(sessions)
+
+
+if __name__ == "__main__":
+    main()
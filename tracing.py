@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Lightweight cross-process tracing for the check-in pipeline.
+Each component appends timestamped span events tagged with a shared session ID
+to a local JSON Lines collector file. Use trace_report.py to read them back.
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Environment variables shared by all components
+TRACE_FILE_ENV = 'TIGERLAUNCH_TRACE_FILE'
+TRACE_ENABLED_ENV = 'TIGERLAUNCH_TRACE'
+SESSION_ENV = 'TIGERLAUNCH_SESSION_ID'
+
+# HTTP header used to pass the session ID to audio_server.py
+SESSION_HEADER = 'X-Session-Id'
+
+TRACE_FILE = os.getenv(TRACE_FILE_ENV, os.path.join(BASE_DIR, 'trace_events.jsonl'))
+ENABLED = os.getenv(TRACE_ENABLED_ENV, '1') != '0'
+COMPONENT = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+
+# Pass as session_id to emit an event that belongs to no session (e.g. standby spawns)
+NO_SESSION = object()
+
+_session_id = os.getenv(SESSION_ENV) or None
+
+
+def new_session_id():
+    """Create a new session ID and make it current for this process."""
+    return set_session_id(uuid.uuid4().hex[:12])
+
+
+def set_session_id(session_id):
+    """Set the session ID attached to events that don't pass one explicitly."""
+    global _session_id
+    _session_id = session_id or None
+    return _session_id
+
+
+def current_session_id():
+    return _session_id
+
+
+def emit(stage, session_id=None, ts=None, duration=None, **attrs):
+    """
+    Append one event to the collector file.
+
+    `ts` is a time.time() wall-clock timestamp (defaults to now) so events from
+    different processes line up. `duration` is in seconds for spans, None for
+    point events. Tracing never raises into the caller.
+    """
+    if not ENABLED:
+        return
+    if session_id is NO_SESSION:
+        session = None
+    else:
+        session = session_id or _session_id
+    event = {
+        'session': session,
+        'stage': stage,
+        'component': COMPONENT,
+        'pid': os.getpid(),
+        'ts': time.time() if ts is None else ts,
+        'dur': duration,
+    }
+    if attrs:
+        event['attrs'] = attrs
+    try:
+        # A single O_APPEND write per line keeps concurrent writers from interleaving
+        line = (json.dumps(event, default=str) + '\n').encode('utf-8')
+        fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+@contextmanager
+def span(stage, session_id=None, **attrs):
+    """Time a block of code and emit it as one event when it exits."""
+    ts = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit(stage, session_id=session_id, ts=ts,
+             duration=time.perf_counter() - start, **attrs)